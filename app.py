@@ -1,6 +1,9 @@
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, abort
 from models import db, User, Attendance, Activity, Mark, Project, TeacherRemark, Extracurricular, AttendanceSession, AttendanceRecord
+from models import Term, ArchivedAttendance, ArchivedAttendanceRecord, TermAttendanceSummary
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import func, case, select, insert, union_all
+import click
 import os
 from datetime import datetime, timedelta
 import uuid
@@ -13,6 +16,104 @@ app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 db.init_app(app)
 app.jinja_env.globals.update(now=datetime.utcnow)
 
+# Attendance helpers
+# Closed terms are moved into the archive tables by `flask archive-term`.
+# Pages pick what to read with '?term=': 'recent' reads only the live
+# (not yet archived) rows, '<id>' reads one archived term and 'all' reads both.
+def get_archived_terms():
+    return Term.query.filter_by(is_archived=True).order_by(Term.start_date.desc()).all()
+
+def get_archived_term_for(date_obj):
+    return Term.query.filter(Term.is_archived == True,
+                             Term.start_date <= date_obj,
+                             Term.end_date >= date_obj).first()
+
+def get_selected_term(default):
+    # Returns 'recent', 'all', or an archived Term
+    term = request.args.get('term') or default
+    if term in ('recent', 'all'):
+        return term
+    if not term.isdigit():
+        abort(404)
+    return Term.query.filter_by(id=int(term), is_archived=True).first_or_404()
+
+def get_attendance_percentage(student_id, term='all'):
+    if isinstance(term, Term):
+        summary = TermAttendanceSummary.query.filter_by(student_id=student_id, term_id=term.id).first()
+        total_days = summary.total_days if summary else 0
+        present_days = summary.present_days if summary else 0
+    else:
+        total_days, present_days = db.session.query(
+            func.count(Attendance.id),
+            func.coalesce(func.sum(case((Attendance.status == 'Present', 1), else_=0)), 0)
+        ).filter(Attendance.student_id == student_id).one()
+        if term == 'all':
+            # Archived terms count through their summaries, not the archive tables
+            archived_total, archived_present = db.session.query(
+                func.coalesce(func.sum(TermAttendanceSummary.total_days), 0),
+                func.coalesce(func.sum(TermAttendanceSummary.present_days), 0)
+            ).filter(TermAttendanceSummary.student_id == student_id).one()
+            total_days += archived_total
+            present_days += archived_present
+
+    if total_days > 0:
+        return round((present_days / total_days) * 100, 2)
+    return 0
+
+def get_attendance_history(student_id, term='recent'):
+    live = select(Attendance.date.label('date'), Attendance.status.label('status')) \
+        .where(Attendance.student_id == student_id)
+    archived = select(ArchivedAttendance.date.label('date'), ArchivedAttendance.status.label('status')) \
+        .where(ArchivedAttendance.student_id == student_id)
+
+    if term == 'recent':
+        history = live.subquery()
+    elif term == 'all':
+        history = union_all(live, archived).subquery()
+    else:
+        history = archived.where(ArchivedAttendance.term_id == term.id).subquery()
+    return db.session.query(history.c.date, history.c.status).order_by(history.c.date.desc()).all()
+
+def archive_term(term):
+    # Move a closed term's rows into the archive tables, leaving per-student totals behind.
+    start = datetime.combine(term.start_date, datetime.min.time())
+    end = datetime.combine(term.end_date + timedelta(days=1), datetime.min.time())
+    in_term = (Attendance.date >= term.start_date) & (Attendance.date <= term.end_date)
+    records_in_term = (AttendanceRecord.timestamp >= start) & (AttendanceRecord.timestamp < end)
+
+    totals = {}
+    for student_id, total_days, present_days in db.session.query(
+            Attendance.student_id,
+            func.count(Attendance.id),
+            func.sum(case((Attendance.status == 'Present', 1), else_=0))
+    ).filter(in_term).group_by(Attendance.student_id):
+        totals[student_id] = [total_days, present_days, 0]
+    for student_id, scans in db.session.query(
+            AttendanceRecord.student_id, func.count(AttendanceRecord.id)
+    ).filter(records_in_term).group_by(AttendanceRecord.student_id):
+        totals.setdefault(student_id, [0, 0, 0])[2] = scans
+
+    for student_id, (total_days, present_days, scans) in totals.items():
+        db.session.add(TermAttendanceSummary(student_id=student_id, term_id=term.id, total_days=total_days,
+                                             present_days=present_days, scans=scans))
+
+    db.session.execute(insert(ArchivedAttendance).from_select(
+        ['source_id', 'term_id', 'student_id', 'date', 'status'],
+        select(Attendance.id, term.id, Attendance.student_id, Attendance.date, Attendance.status).where(in_term)
+    ))
+    db.session.execute(insert(ArchivedAttendanceRecord).from_select(
+        ['source_id', 'term_id', 'student_id', 'session_id', 'timestamp', 'status'],
+        select(AttendanceRecord.id, term.id, AttendanceRecord.student_id, AttendanceRecord.session_id,
+               AttendanceRecord.timestamp, AttendanceRecord.status).where(records_in_term)
+    ))
+    moved = Attendance.query.filter(in_term).delete(synchronize_session=False)
+    moved_records = AttendanceRecord.query.filter(records_in_term).delete(synchronize_session=False)
+
+    term.is_archived = True
+    term.archived_at = datetime.utcnow()
+    db.session.commit()
+    return moved, moved_records
+
 @app.route('/')
 def index():
     # Home page should be accessible to everyone, logged in or not
@@ -68,6 +169,11 @@ def mark_attendance():
     date_str = request.form.get('date')
     date_obj = datetime.strptime(date_str, '%Y-%m-%d').date()
     
+    archived_term = get_archived_term_for(date_obj)
+    if archived_term:
+        flash(f'{archived_term.name} is archived, attendance for it can no longer be changed.')
+        return redirect(url_for('teacher_dashboard'))
+    
     students = User.query.filter_by(role='student').all()
     for student in students:
         status = request.form.get(f'status_{student.id}')
@@ -128,12 +234,9 @@ def student_profile(student_id):
     
     student = User.query.get_or_404(student_id)
     
-    # Calculate Attendance
-    total_days = Attendance.query.filter_by(student_id=student.id).count()
-    present_days = Attendance.query.filter_by(student_id=student.id, status='Present').count()
-    attendance_percentage = 0
-    if total_days > 0:
-        attendance_percentage = round((present_days / total_days) * 100, 2)
+    # Calculate Attendance (all terms unless narrowed with '?term=')
+    selected_term = get_selected_term('all')
+    attendance_percentage = get_attendance_percentage(student.id, selected_term)
         
     marks = Mark.query.filter_by(student_id=student.id).all()
     projects = Project.query.filter_by(student_id=student.id).all()
@@ -142,6 +245,7 @@ def student_profile(student_id):
     
     return render_template('student_profile.html', student=student, 
                            attendance_percentage=attendance_percentage,
+                           terms=get_archived_terms(), selected_term=selected_term,
                            marks=marks, projects=projects, remarks=remarks, extracurriculars=extracurriculars)
 
 @app.route('/teacher/mark/add/<int:student_id>', methods=['POST'])
@@ -332,11 +436,7 @@ def student_dashboard():
     
     
     # Calculate Attendance Percentage
-    total_days = Attendance.query.filter_by(student_id=user_id).count()
-    present_days = Attendance.query.filter_by(student_id=user_id, status='Present').count()
-    attendance_percentage = 0
-    if total_days > 0:
-        attendance_percentage = round((present_days / total_days) * 100, 2)
+    attendance_percentage = get_attendance_percentage(user_id)
 
     # Simplified Dashboard Data (Counts Only)
     marks_count = Mark.query.filter_by(student_id=user_id).count()
@@ -355,9 +455,11 @@ def student_attendance():
         return redirect(url_for('login'))
     
     user_id = session['user_id']
-    attendance_history = Attendance.query.filter_by(student_id=user_id).order_by(Attendance.date.desc()).all()
+    selected_term = get_selected_term('recent')
+    attendance_history = get_attendance_history(user_id, selected_term)
     
-    return render_template('student_attendance.html', attendance_history=attendance_history)
+    return render_template('student_attendance.html', attendance_history=attendance_history,
+                           terms=get_archived_terms(), selected_term=selected_term)
 
 @app.route('/student/results')
 def student_results():
@@ -569,5 +671,44 @@ def init_db_command():
         else:
             print("Database already initialized.")
 
+# Archive a closed term, e.g. flask archive-term "2024-25 Term 1" 2024-06-01 2024-10-31
+@app.cli.command("archive-term")
+@click.argument("name")
+@click.argument("start_date", metavar="START_DATE", type=click.DateTime(formats=['%Y-%m-%d']))
+@click.argument("end_date", metavar="END_DATE", type=click.DateTime(formats=['%Y-%m-%d']))
+def archive_term_command(name, start_date, end_date):
+    with app.app_context():
+        db.create_all()
+        start_obj = start_date.date()
+        end_obj = end_date.date()
+        
+        if start_obj > end_obj:
+            raise click.UsageError("START_DATE must not be after END_DATE.")
+        if end_obj >= datetime.utcnow().date():
+            raise click.UsageError("Only closed terms can be archived.")
+        
+        term = Term.query.filter_by(name=name).first()
+        if term and term.is_archived:
+            print(f"{name} is already archived.")
+            return
+        
+        overlapping = Term.query.filter(Term.name != name,
+                                        Term.start_date <= end_obj,
+                                        Term.end_date >= start_obj).first()
+        if overlapping:
+            raise click.UsageError(f"{name} overlaps {overlapping.name} "
+                                   f"({overlapping.start_date} to {overlapping.end_date}).")
+        
+        if not term:
+            term = Term(name=name, start_date=start_obj, end_date=end_obj)
+            db.session.add(term)
+        else:
+            term.start_date = start_obj
+            term.end_date = end_obj
+        db.session.flush()
+        
+        moved, moved_records = archive_term(term)
+        print(f"Archived {name}: {moved} attendance rows, {moved_records} scan records.")
+
 if __name__ == '__main__':
     app.run(debug=True)
@@ -90,3 +90,45 @@ class AttendanceRecord(db.Model):
     timestamp = db.Column(db.DateTime, default=datetime.utcnow)
     status = db.Column(db.String(20), default='Present')
 
+
+# Academic terms. Once a term is closed and archived, its attendance rows are
+# moved out of the live tables and only per-student totals stay behind.
+class Term(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), unique=True, nullable=False)  # e.g. '2024-25 Term 1'
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    is_archived = db.Column(db.Boolean, default=False)
+    archived_at = db.Column(db.DateTime, nullable=True)
+
+class ArchivedAttendance(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, nullable=False)  # id the row had in 'attendance', ids can be reused there
+    term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    date = db.Column(db.Date, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+
+    __table_args__ = (db.Index('ix_archived_attendance_term_student', 'term_id', 'student_id'),)
+
+class ArchivedAttendanceRecord(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    source_id = db.Column(db.Integer, nullable=False)  # id the row had in 'attendance_record', ids can be reused there
+    term_id = db.Column(db.Integer, db.ForeignKey('term.id'), nullable=False)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    session_id = db.Column(db.Integer, db.ForeignKey('attendance_session.id'), nullable=False)
+    timestamp = db.Column(db.DateTime, nullable=True)
+    status = db.Column(db.String(20), default='Present')
+
+    __table_args__ = (db.Index('ix_archived_attendance_record_term_student', 'term_id', 'student_id'),)
+
+# Pre-aggregated totals per student per archived term, so dashboard percentages
+# never have to touch the archive tables.
+class TermAttendanceSummary(db.Model):
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    term_id = db.Column(db.Integer, db.ForeignKey('term.id'), primary_key=True)
+    total_days = db.Column(db.Integer, nullable=False, default=0)
+    present_days = db.Column(db.Integer, nullable=False, default=0)
+    scans = db.Column(db.Integer, nullable=False, default=0)
+
+    term = db.relationship('Term', lazy=True)